@@ -0,0 +1,293 @@
+/**
+ * @file ompt_parse.c
+ * @version 0.1
+ * @brief Native scanner for OMPT logs, loaded by tools/ompt_parser.py via ctypes.
+ *
+ * Walks a (memory-mapped) byte buffer line by line and fills caller-provided
+ * column buffers for every "[OMPT] Thread ..." event. Event types and details
+ * are interned into a string table of buffer offsets so Python only decodes
+ * each distinct value once. Annotation lines are rare and are handed back as
+ * offsets for the Python parser to handle.
+ *
+ * Event lines are accepted in the common, unambiguous layout of the event
+ * pattern in ompt_parser.py. Any event line outside that layout makes the
+ * scan return OMPT_PARSE_FALLBACK so the caller re-parses the range in Python.
+ */
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define OMPT_PARSE_ERROR    -1
+#define OMPT_PARSE_FALLBACK -2
+
+#define EVENT_PREFIX      "[OMPT] Thread "
+#define EVENT_PREFIX_LEN  14
+#define OMPT_PREFIX       "[OMPT]"
+#define OMPT_PREFIX_LEN   6
+#define ANN_PREFIX        "[OMPT_annotation]"
+#define ANN_PREFIX_LEN    17
+#define MAX_NUMBER_LEN    63
+
+/**
+ * @brief String interning table
+ * Open-addressing hash set of (offset, length) slices of the input buffer.
+ */
+typedef struct {
+  const char *buf;
+  int32_t *slots;         /* string id + 1, 0 marks an empty slot */
+  uint64_t mask;
+  int64_t *offsets;
+  int32_t *lengths;
+  long count;
+  long capacity;
+} string_table_t;
+
+/**
+ * @brief Whitespace as understood by Python's bytes.strip()
+ */
+static inline int is_space(char c) {
+  return c == ' ' || c == '\t' || c == '\n' || c == '\r' || c == '\v' || c == '\f';
+}
+
+static inline int is_digit(char c) {
+  return c >= '0' && c <= '9';
+}
+
+/**
+ * @brief Find the first occurrence of needle in [s, s + n)
+ * @return Pointer to the match, or NULL
+ */
+static const char *find(const char *s, size_t n, const char *needle, size_t needle_len) {
+  if (n < needle_len) {
+    return NULL;
+  }
+  const char *last = s + n - needle_len;
+  for (const char *p = s; p <= last; p++) {
+    p = memchr(p, needle[0], (size_t)(last - p) + 1);
+    if (p == NULL) {
+      return NULL;
+    }
+    if (memcmp(p, needle, needle_len) == 0) {
+      return p;
+    }
+  }
+  return NULL;
+}
+
+/**
+ * @brief Intern the slice [s, s + n) of the buffer
+ * @return The string id, or OMPT_PARSE_ERROR when the table is full
+ */
+static long intern(string_table_t *table, const char *s, int32_t n) {
+  uint64_t hash = 1469598103934665603ULL;  /* FNV-1a */
+  for (int32_t i = 0; i < n; i++) {
+    hash = (hash ^ (unsigned char)s[i]) * 1099511628211ULL;
+  }
+  for (uint64_t slot = hash & table->mask;; slot = (slot + 1) & table->mask) {
+    int32_t id = table->slots[slot] - 1;
+    if (id < 0) {
+      if (table->count == table->capacity) {
+        return OMPT_PARSE_ERROR;
+      }
+      id = (int32_t)table->count++;
+      table->offsets[id] = s - table->buf;
+      table->lengths[id] = n;
+      table->slots[slot] = id + 1;
+      return id;
+    }
+    if (table->lengths[id] == n && memcmp(table->buf + table->offsets[id], s, (size_t)n) == 0) {
+      return id;
+    }
+  }
+}
+
+/**
+ * @brief Check that [s, s + n) is digits with at most one '.', and not only a '.'
+ */
+static int is_number(const char *s, size_t n) {
+  int dots = 0;
+  size_t digits = 0;
+  for (size_t i = 0; i < n; i++) {
+    if (is_digit(s[i])) {
+      digits++;
+    } else if (s[i] == '.' && dots == 0) {
+      dots++;
+    } else {
+      return 0;
+    }
+  }
+  return digits > 0;
+}
+
+/**
+ * @brief Scan the OMPT log lines in buf[start, end)
+ * @param buf Start of the mapped log
+ * @param start Offset of the first line to scan
+ * @param end Offset one past the last byte to scan
+ * @param capacity Size of the per-event and per-annotation output buffers
+ * @param timestamps Output event timestamps (ms)
+ * @param thread_ids Output event thread ids
+ * @param type_ids Output event type string ids
+ * @param detail_ids Output event details string ids
+ * @param str_offsets Output string table offsets into buf (2 * capacity + 1 entries)
+ * @param str_lengths Output string table lengths (2 * capacity + 1 entries)
+ * @param num_strings Output number of strings in the table
+ * @param ann_offsets Output offsets of annotation lines
+ * @param ann_lengths Output lengths of annotation lines
+ * @param num_annotations Output number of annotation lines
+ * @return Number of events, OMPT_PARSE_ERROR, or OMPT_PARSE_FALLBACK
+ */
+long ompt_parse_events(
+  const char *buf,
+  long start,
+  long end,
+  long capacity,
+  double *timestamps,
+  int32_t *thread_ids,
+  int32_t *type_ids,
+  int32_t *detail_ids,
+  int64_t *str_offsets,
+  int32_t *str_lengths,
+  long *num_strings,
+  int64_t *ann_offsets,
+  int32_t *ann_lengths,
+  long *num_annotations) {
+
+  string_table_t table;
+  uint64_t num_slots = 1;
+  while (num_slots < (uint64_t)(4 * capacity + 2)) {
+    num_slots <<= 1;
+  }
+  table.buf = buf;
+  table.slots = calloc(num_slots, sizeof(int32_t));
+  table.mask = num_slots - 1;
+  table.offsets = str_offsets;
+  table.lengths = str_lengths;
+  table.count = 0;
+  table.capacity = 2 * capacity + 1;
+  if (table.slots == NULL) {
+    return OMPT_PARSE_ERROR;
+  }
+
+  long n = 0;
+  long n_ann = 0;
+  long result = 0;
+  const char *p = buf + start;
+  const char *limit = buf + end;
+  char number[MAX_NUMBER_LEN + 1];
+
+  while (p < limit) {
+    const char *nl = memchr(p, '\n', (size_t)(limit - p));
+    const char *line = p;
+    const char *line_end = nl ? nl : limit;
+    p = nl ? nl + 1 : limit;
+
+    // Strip surrounding whitespace
+    while (line < line_end && is_space(*line)) {
+      line++;
+    }
+    while (line_end > line && is_space(line_end[-1])) {
+      line_end--;
+    }
+    size_t len = (size_t)(line_end - line);
+    if (len == 0) {
+      continue;
+    }
+
+    // Annotations are parsed by the caller
+    if (len >= ANN_PREFIX_LEN && memcmp(line, ANN_PREFIX, ANN_PREFIX_LEN) == 0) {
+      if (n_ann == capacity) {
+        result = OMPT_PARSE_ERROR;
+        break;
+      }
+      ann_offsets[n_ann] = line - buf;
+      ann_lengths[n_ann] = (int32_t)len;
+      n_ann++;
+      continue;
+    }
+    if (len < EVENT_PREFIX_LEN || memcmp(line, EVENT_PREFIX, EVENT_PREFIX_LEN) != 0) {
+      // Other "[OMPT]" lines and program output carry no event
+      continue;
+    }
+    if (n == capacity) {
+      result = OMPT_PARSE_ERROR;
+      break;
+    }
+
+    // Thread id: digits up to the first space
+    const char *rest = line + EVENT_PREFIX_LEN;
+    const char *sp = memchr(rest, ' ', (size_t)(line_end - rest));
+    if (sp == NULL || sp == rest) {
+      result = OMPT_PARSE_FALLBACK;
+      break;
+    }
+    long thread_id = 0;
+    for (const char *c = rest; c < sp; c++) {
+      if (!is_digit(*c) || thread_id > (INT32_MAX - 9) / 10) {
+        thread_id = -1;
+        break;
+      }
+      thread_id = thread_id * 10 + (*c - '0');
+    }
+    rest = sp + 1;
+
+    // Event type: up to the first " at "
+    const char *at = find(rest, (size_t)(line_end - rest), " at ", 4);
+    if (thread_id < 0 || at == NULL || at == rest) {
+      result = OMPT_PARSE_FALLBACK;
+      break;
+    }
+
+    // Timestamp: up to the first " ms"
+    const char *ts = at + 4;
+    const char *ms = find(ts, (size_t)(line_end - ts), " ms", 3);
+    if (ms == NULL || ms - ts > MAX_NUMBER_LEN || !is_number(ts, (size_t)(ms - ts))) {
+      result = OMPT_PARSE_FALLBACK;
+      break;
+    }
+    memcpy(number, ts, (size_t)(ms - ts));
+    number[ms - ts] = '\0';
+
+    // Optional "(details)" after at least one whitespace
+    const char *tail = ms + 3;
+    const char *stripped = tail;
+    const char *details = tail;
+    size_t details_len = 0;
+    while (stripped < line_end && is_space(*stripped)) {
+      stripped++;
+    }
+    if (stripped > tail && stripped < line_end && *stripped == '(' && line_end - stripped > 2) {
+      const char *close = memchr(stripped + 2, ')', (size_t)(line_end - stripped - 2));
+      if (close != NULL) {
+        details = stripped + 1;
+        details_len = (size_t)(close - details);
+      }
+    }
+
+    const char *type = rest;
+    const char *type_end = at;
+    while (type < type_end && is_space(*type)) {
+      type++;
+    }
+    while (type_end > type && is_space(type_end[-1])) {
+      type_end--;
+    }
+
+    long type_id = intern(&table, type, (int32_t)(type_end - type));
+    long detail_id = intern(&table, details, (int32_t)details_len);
+    if (type_id < 0 || detail_id < 0) {
+      result = OMPT_PARSE_ERROR;
+      break;
+    }
+    timestamps[n] = strtod(number, NULL);
+    thread_ids[n] = (int32_t)thread_id;
+    type_ids[n] = (int32_t)type_id;
+    detail_ids[n] = (int32_t)detail_id;
+    n++;
+  }
+
+  free(table.slots);
+  *num_strings = table.count;
+  *num_annotations = n_ann;
+  return result < 0 ? result : n;
+}
@@ -1,228 +1,610 @@
 #!/usr/bin/env python3
+import os
 import sys
 import re
+import mmap
+import ctypes
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+from array import array
 from collections import defaultdict, namedtuple
+from itertools import repeat
+from operator import attrgetter, itemgetter
 
-# Event structure
-Event = namedtuple("Event", ["timestamp", "thread_id", "event_type", "details"])
+import numpy as np
+
+# Annotation structure (events are stored column-wise on the parser)
 Annotation = namedtuple("Annotation", ["timestamp", "thread_id", "label"])
 
+# Line patterns, compiled once instead of on every parsed line. The log is
+# parsed as raw bytes, so the patterns are bytes patterns too.
+# Pattern: [OMPT] Thread X EVENT_TYPE at Y.Z ms (DETAILS)
+_EVENT_PATTERN = rb"\[OMPT\] Thread (\d+) (.+?) at ([\d.]+) ms(?:[^\S\n]+\((.+?)\))?"
+# Pattern: [OMPT_annotation] Thread X Annotation at Y.Z ms: LABEL
+_ANN_PATTERN = rb"\[OMPT_annotation\] Thread (\d+) Annotation at ([\d.]+) ms: (.+)"
+_ANN_RE = re.compile(_ANN_PATTERN)
+# Line kinds matched at the start of each (whitespace-stripped) line, so a
+# single finditer pass over the buffer finds every record. In _LINE_RE groups
+# 1-4 are an event and groups 5-7 an annotation; _EVENT_LINE_RE is the
+# specialisation for logs without annotations.
+_LINE_RE = re.compile(
+    rb"^[ \t\r\v\f]*(?:" + _EVENT_PATTERN + rb"|" + _ANN_PATTERN + rb")",
+    re.MULTILINE,
+)
+_EVENT_LINE_RE = re.compile(rb"^[ \t\r\v\f]*" + _EVENT_PATTERN, re.MULTILINE)
+
+# Native scanner built from src/ompt_parse.c by `make`; parsing falls back to
+# Python when it has not been built
+_NATIVE_LIB = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "lib", "ompt_parse.so"
+)
+
+
+def _load_native_parser():
+    """Load the native scanner, or return None if it is not available."""
+    try:
+        lib = ctypes.CDLL(_NATIVE_LIB)
+    except OSError:
+        return None
+    array_of = lambda dtype: np.ctypeslib.ndpointer(dtype, flags="C_CONTIGUOUS")
+    lib.ompt_parse_events.restype = ctypes.c_long
+    lib.ompt_parse_events.argtypes = [
+        ctypes.c_void_p,  # buf
+        ctypes.c_long,  # start
+        ctypes.c_long,  # end
+        ctypes.c_long,  # capacity
+        array_of(np.float64),  # timestamps
+        array_of(np.int32),  # thread_ids
+        array_of(np.int32),  # type_ids
+        array_of(np.int32),  # detail_ids
+        array_of(np.int64),  # str_offsets
+        array_of(np.int32),  # str_lengths
+        ctypes.POINTER(ctypes.c_long),  # num_strings
+        array_of(np.int64),  # ann_offsets
+        array_of(np.int32),  # ann_lengths
+        ctypes.POINTER(ctypes.c_long),  # num_annotations
+    ]
+    return lib
+
+
+_native = _load_native_parser()
+
+# Ranges smaller than this are scanned on a single thread
+_MIN_CHUNK_BYTES = 8 << 20
+
+# Rough bytes per log line, used to presize the event columns of a range
+_AVG_LINE_BYTES = 80
+
+# Report line templates, shared by every row of the timeline listing
+_EVENT_FMT = "%3d. %8.2fms | Thread %d | %s"
+_DETAILS_FMT = "                | Details: %s"
+_ANN_FMT = "%3d. %8.2fms | Thread %d | ANNOTATION: %s"
+
 
 class OMPTParser:
+    _line_re = _LINE_RE
+    _event_line_re = _EVENT_LINE_RE
+    _ann_re = _ANN_RE
+
     def __init__(self, filename):
         self.filename = filename
-        self.events = []
+        # Events are stored column-wise (struct of arrays) rather than as one
+        # tuple per line, which keeps multi-million event traces compact
+        self.timestamps = array("d")
+        self.thread_ids = array("i")
+        self.event_type_ids = array("i")
+        # Most events carry no "(...)" details, so they are kept sparsely as
+        # row index -> details string
+        self.details = {}
+        self.event_types = []  # event type id -> event type string
+        self._event_type_ids = {}  # event type string -> event type id
+        # thread id -> row indices of the thread's events, filled while parsing
+        # so the per-thread summary needs no bucketing pass of its own
+        self.thread_events = defaultdict(lambda: array("q"))
         self.annotations = []
         self.threads = set()
+        # OMPT output is nearly always in time order; remember whether it was
+        # so analysis can skip sorting
+        self._events_sorted = True
+        self._annotations_sorted = True
+        self._decoded = {}  # raw bytes field -> decoded str
 
     def parse_file(self):
         """Parse the OMPT output file and extract events and annotations."""
         print(f"Parsing OMPT output file: {self.filename}")
 
-        with open(self.filename, "r") as f:
-            lines = f.readlines()
-            
-            # Find Region of Interest (ROI) if exists
-            # Find ROI_START and ROI_END lines starting with [OMPT_annotation]
-            roi_start_idx = None
-            roi_end_idx = None
-            for i, line in enumerate(lines):
-                if "[OMPT_annotation]" in line and "ROI_START" in line:
-                    roi_start_idx = i
-                elif "[OMPT_annotation]" in line and "ROI_END" in line:
-                    roi_end_idx = i
-                    break
-            if roi_start_idx is not None and roi_end_idx is not None:
-                # Get lines between ROI_START and ROI_END, excluding those markers
-                lines_to_parse = [line.strip() for line in lines[roi_start_idx + 1:roi_end_idx]]
-            elif roi_start_idx is not None:
-                # ROI_START found but no ROI_END, take from ROI_START to end
-                lines_to_parse = [line.strip() for line in lines[roi_start_idx + 1:]]
-            else:
-                # No ROI markers found, parse all lines
-                lines_to_parse = [line.strip() for line in lines]
-            
-            
-            # for line_num, line in enumerate(f, 1):
-            for line_num, line in enumerate(lines_to_parse, 1):
-                line = line.strip()
-                if not line:
-                    continue
-
-                # Check for annotations first
-                if line.startswith("[OMPT_annotation]"):
-                    annotation = self._parse_annotation(line)
-                    if annotation:
-                        self.annotations.append(annotation)
-                        self.threads.add(annotation.thread_id)
-                    continue
-
-                # Check for regular OMPT events
-                if not line.startswith("[OMPT]"):
-                    continue
-
-                event = self._parse_line(line)
-                if event:
-                    self.events.append(event)
-                    self.threads.add(event.thread_id)
-
-        self.threads = sorted(list(self.threads))
+        # Map the file instead of reading it into decoded str lines; the OMPT
+        # log is ASCII and the OS pages it in on demand
+        with open(self.filename, "rb") as f:
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    start, end = self._find_roi(buf)
+                    self._parse_range(buf, start, end)
+
+        self.thread_events = {
+            thread_id: np.frombuffer(rows, dtype=np.int64)
+            for thread_id, rows in self.thread_events.items()
+        }
+        self.threads = sorted(self.threads)
         print(
-            f"Parsed {len(self.events)} events and {len(self.annotations)} annotations for {len(self.threads)} threads"
+            f"Parsed {len(self.timestamps)} events and {len(self.annotations)} annotations for {len(self.threads)} threads"
         )
 
-    def _parse_line(self, line):
-        """Parse a single OMPT output line."""
-        # Pattern: [OMPT] Thread X EVENT_TYPE at Y.Z ms ...
-        pattern = r"\[OMPT\] Thread (\d+) (.+?) at ([\d.]+) ms(?:\s+\((.+?)\))?"
-        match = re.match(pattern, line)
-
-        if not match:
+    def _find_roi(self, buf):
+        """Find the byte range to parse, honouring ROI_START/ROI_END markers.
+
+        The range runs from the line after the last ROI_START preceding the
+        first ROI_END up to (excluding) that ROI_END line. Without an ROI_END
+        it runs to the end of the file; without ROI_START it is the whole file.
+        """
+        roi_start = None
+        pos = buf.find(b"ROI_")
+        while pos != -1:
+            line_start = buf.rfind(b"\n", 0, pos) + 1
+            line_end = buf.find(b"\n", pos)
+            if line_end == -1:
+                line_end = len(buf)
+            line = buf[line_start:line_end]
+            if b"[OMPT_annotation]" in line:
+                if b"ROI_START" in line:
+                    roi_start = min(line_end + 1, len(buf))
+                elif b"ROI_END" in line:
+                    if roi_start is not None:
+                        # Lines between ROI_START and ROI_END, excluding the markers
+                        return roi_start, line_start
+                    break
+            pos = buf.find(b"ROI_", line_end)
+        if roi_start is not None:
+            # ROI_START found but no ROI_END, take from ROI_START to end
+            return roi_start, len(buf)
+        # No ROI markers found, parse all lines
+        return 0, len(buf)
+
+    def _parse_range(self, buf, start, end):
+        """Parse the lines of buf between byte offsets start and end."""
+        if _native is not None and self._parse_range_native(buf, start, end):
+            return
+
+        # Without the native scanner, one regex pass over the range finds the
+        # records without any per-line Python dispatch; lines that are not
+        # OMPT records are skipped inside the regex engine. Most traces carry
+        # no annotations, and one find() over the range is enough to pick the
+        # events-only loop for them.
+        if buf.find(b"[OMPT_annotation]", start, end) == -1:
+            self._parse_events_only(buf, start, end)
+        else:
+            self._parse_events_and_annotations(buf, start, end)
+
+    def _preallocate_events(self, start, end):
+        """Reserve event rows for a byte range, sized from its length.
+
+        The regex loops fill the reserved rows by index, reserving another
+        step rows whenever the estimate falls short, and trim the unused tail
+        with _truncate_events. Returns (first row, capacity, step).
+        """
+        row = len(self.timestamps)
+        step = max(1024, (end - start) // _AVG_LINE_BYTES)
+        self._reserve_events(step)
+        return row, row + step, step
+
+    def _reserve_events(self, count):
+        """Append count placeholder rows to the event columns."""
+        for column in (self.timestamps, self.thread_ids, self.event_type_ids):
+            column.frombytes(bytes(column.itemsize * count))
+
+    def _truncate_events(self, count):
+        """Drop event rows past the first count."""
+        for column in (self.timestamps, self.thread_ids, self.event_type_ids):
+            del column[count:]
+
+    def _parse_events_only(self, buf, start, end):
+        """Regex pass over a range known to contain no annotation lines."""
+        row, capacity, step = self._preallocate_events(start, end)
+        timestamps, thread_ids = self.timestamps, self.thread_ids
+        event_type_ids, event_details = self.event_type_ids, self.details
+        thread_events, threads = self.thread_events, self.threads
+        type_id, decode = self._type_id, self._decode
+        last_event_ts = float("-inf")
+        for thread_id, event_type, timestamp, details in map(
+            re.Match.groups, self._event_line_re.finditer(buf, start, end)
+        ):
+            timestamp = float(timestamp)
+            if timestamp < last_event_ts:
+                self._events_sorted = False
+            last_event_ts = timestamp
+            thread_id = int(thread_id)
+            if row == capacity:
+                self._reserve_events(step)
+                capacity += step
+            thread_events[thread_id].append(row)
+            timestamps[row] = timestamp
+            thread_ids[row] = thread_id
+            event_type_ids[row] = type_id(decode(event_type.strip()))
+            if details:
+                event_details[row] = decode(details)
+            threads.add(thread_id)
+            row += 1
+        self._truncate_events(row)
+
+    def _parse_events_and_annotations(self, buf, start, end):
+        """Regex pass over a range that may mix events and annotations."""
+        row, capacity, step = self._preallocate_events(start, end)
+        timestamps, thread_ids = self.timestamps, self.thread_ids
+        event_type_ids, event_details = self.event_type_ids, self.details
+        thread_events, threads = self.thread_events, self.threads
+        type_id, decode = self._type_id, self._decode
+        last_event_ts = float("-inf")
+        last_annotation_ts = float("-inf")
+        for (
+            thread_id, event_type, timestamp, details,
+            ann_thread_id, ann_timestamp, label,
+        ) in map(re.Match.groups, self._line_re.finditer(buf, start, end)):
+            if thread_id is not None:
+                timestamp = float(timestamp)
+                if timestamp < last_event_ts:
+                    self._events_sorted = False
+                last_event_ts = timestamp
+                thread_id = int(thread_id)
+                if row == capacity:
+                    self._reserve_events(step)
+                    capacity += step
+                thread_events[thread_id].append(row)
+                timestamps[row] = timestamp
+                thread_ids[row] = thread_id
+                event_type_ids[row] = type_id(decode(event_type.strip()))
+                if details:
+                    event_details[row] = decode(details)
+                threads.add(thread_id)
+                row += 1
+            else:
+                annotation = Annotation(
+                    float(ann_timestamp),
+                    int(ann_thread_id),
+                    label.strip().decode("utf-8", "replace"),
+                )
+                if annotation.timestamp < last_annotation_ts:
+                    self._annotations_sorted = False
+                last_annotation_ts = annotation.timestamp
+                self.annotations.append(annotation)
+                threads.add(annotation.thread_id)
+        self._truncate_events(row)
+
+    def _parse_range_native(self, buf, start, end):
+        """Parse a byte range with the native scanner.
+
+        Large ranges are split at line boundaries and scanned concurrently;
+        ctypes releases the GIL during the call, so threads scale across
+        cores. Returns False, leaving the parser untouched, when any chunk hits
+        a line that needs the Python slow path.
+        """
+        num_chunks = min(os.cpu_count() or 1, (end - start) // _MIN_CHUNK_BYTES)
+        bounds = [start]
+        for i in range(1, num_chunks):
+            split = buf.find(b"\n", start + (end - start) * i // num_chunks)
+            bounds.append(min(split + 1, end) if split != -1 else end)
+        bounds.append(end)
+        chunks = [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+
+        view = np.frombuffer(buf, dtype=np.uint8)
+        try:
+            address = view.ctypes.data
+            if len(chunks) > 1:
+                with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                    scans = list(
+                        pool.map(lambda chunk: self._scan_native(address, *chunk), chunks)
+                    )
+            else:
+                scans = [self._scan_native(address, *chunk) for chunk in chunks]
+        finally:
+            # The mmap cannot be closed while a view exports its buffer
+            del view
+        if None in scans:
+            return False
+
+        for scan in scans:
+            self._append_scan(buf, scan)
+        return True
+
+    def _scan_native(self, address, start, end):
+        """Run the native scanner over buf[start:end] at the given address.
+
+        Returns the trimmed output columns, or None if the range needs the
+        Python slow path.
+        """
+        # No event or annotation line is shorter than an annotation prefix
+        # plus newline, which bounds the number of records in the range
+        capacity = (end - start) // 18 + 1
+        timestamps = np.empty(capacity, dtype=np.float64)
+        thread_ids = np.empty(capacity, dtype=np.int32)
+        type_ids = np.empty(capacity, dtype=np.int32)
+        detail_ids = np.empty(capacity, dtype=np.int32)
+        str_offsets = np.empty(2 * capacity + 1, dtype=np.int64)
+        str_lengths = np.empty(2 * capacity + 1, dtype=np.int32)
+        ann_offsets = np.empty(capacity, dtype=np.int64)
+        ann_lengths = np.empty(capacity, dtype=np.int32)
+        num_strings = ctypes.c_long()
+        num_annotations = ctypes.c_long()
+
+        n = _native.ompt_parse_events(
+            address, start, end, capacity,
+            timestamps, thread_ids, type_ids, detail_ids,
+            str_offsets, str_lengths, ctypes.byref(num_strings),
+            ann_offsets, ann_lengths, ctypes.byref(num_annotations),
+        )
+        if n < 0:
             return None
+        return (
+            timestamps[:n],
+            thread_ids[:n],
+            type_ids[:n],
+            detail_ids[:n],
+            str_offsets[:num_strings.value],
+            str_lengths[:num_strings.value],
+            ann_offsets[:num_annotations.value],
+            ann_lengths[:num_annotations.value],
+        )
 
-        thread_id = int(match.group(1))
-        event_type = match.group(2).strip()
-        timestamp = float(match.group(3))
-        details = match.group(4) if match.group(4) else ""
-
-        return Event(timestamp, thread_id, event_type, details)
+    def _append_scan(self, buf, scan):
+        """Append the output of one native scan to the parser state."""
+        (timestamps, thread_ids, type_ids, detail_ids,
+         str_offsets, str_lengths, ann_offsets, ann_lengths) = scan
+
+        strings = [
+            self._decode(buf[offset:offset + length])
+            for offset, length in zip(str_offsets.tolist(), str_lengths.tolist())
+        ]
+
+        # Remap scanner string ids to this parser's event type ids
+        remap = np.full(len(strings), -1, dtype=np.int32)
+        for string_id in np.unique(type_ids).tolist():
+            remap[string_id] = self._type_id(strings[string_id])
+
+        if len(timestamps) and (
+            np.any(timestamps[1:] < timestamps[:-1])
+            or (self.timestamps and timestamps[0] < self.timestamps[-1])
+        ):
+            self._events_sorted = False
+
+        # Group the chunk's rows by thread; the stable sort keeps each
+        # thread's rows in file order
+        order = np.argsort(thread_ids, kind="stable")
+        chunk_threads, starts = np.unique(thread_ids[order], return_index=True)
+        rows = order.astype(np.int64) + len(self.timestamps)
+        for thread_id, thread_rows in zip(chunk_threads.tolist(), np.split(rows, starts[1:])):
+            self.thread_events[thread_id].frombytes(thread_rows.tobytes())
+        self.threads.update(chunk_threads.tolist())
+
+        # Only rows whose details are not the empty string are stored
+        if "" in strings:
+            detail_rows = np.flatnonzero(detail_ids != strings.index(""))
+        else:
+            detail_rows = np.arange(len(detail_ids))
+        self.details.update(zip(
+            (detail_rows + len(self.timestamps)).tolist(),
+            map(strings.__getitem__, detail_ids[detail_rows].tolist()),
+        ))
+
+        self.timestamps.frombytes(timestamps.tobytes())
+        self.thread_ids.frombytes(thread_ids.tobytes())
+        self.event_type_ids.frombytes(remap[type_ids].tobytes())
+
+        for offset, length in zip(ann_offsets.tolist(), ann_lengths.tolist()):
+            annotation = self._parse_annotation(buf[offset:offset + length])
+            if annotation:
+                if self.annotations and annotation.timestamp < self.annotations[-1].timestamp:
+                    self._annotations_sorted = False
+                self.annotations.append(annotation)
+                self.threads.add(annotation.thread_id)
+
+    def _decode(self, raw):
+        """Decode a bytes field, sharing one interned str per distinct value."""
+        text = self._decoded.get(raw)
+        if text is None:
+            text = self._decoded[raw] = sys.intern(raw.decode("utf-8", "replace"))
+        return text
+
+    def _type_id(self, event_type):
+        """Return the id of an event type, registering it on first use."""
+        type_id = self._event_type_ids.get(event_type)
+        if type_id is None:
+            type_id = self._event_type_ids[event_type] = len(self.event_types)
+            self.event_types.append(event_type)
+        return type_id
+
+    def _sort_events(self):
+        """Reorder the event columns by timestamp (stable)."""
+        order = np.argsort(np.frombuffer(self.timestamps, dtype=np.float64), kind="stable")
+        for name in ("timestamps", "thread_ids", "event_type_ids"):
+            column = getattr(self, name)
+            sorted_column = np.frombuffer(column, dtype=column.typecode)[order]
+            setattr(self, name, array(column.typecode, sorted_column.tobytes()))
+
+        # Point the details and per-thread rows at the new positions, the
+        # latter in time order
+        new_row = np.empty_like(order)
+        new_row[order] = np.arange(len(order))
+        detail_rows = np.fromiter(self.details, dtype=np.int64, count=len(self.details))
+        self.details = dict(zip(new_row[detail_rows].tolist(), self.details.values()))
+        self.thread_events = {
+            thread_id: np.sort(new_row[rows])
+            for thread_id, rows in self.thread_events.items()
+        }
 
     def _parse_annotation(self, line):
         """Parse a line for OMPT annotations in format [OMPT_annotation] Thread X Annotation at Y.Z ms: LABEL"""
-        # Pattern: [OMPT_annotation] Thread X Annotation at Y.Z ms: LABEL
-        pattern = r"\[OMPT_annotation\] Thread (\d+) Annotation at ([\d.]+) ms: (.+)"
-        match = re.match(pattern, line)
+        # Fast path: split on the fixed separators around the fields
+        if line.startswith(b"[OMPT_annotation] Thread "):
+            tid_str, sep, rest = line[25:].partition(b" Annotation at ")
+            ts_str, sep2, label = rest.partition(b" ms: ")
+            label = label.strip()
+            if (
+                sep and sep2 and label and tid_str.isdigit()
+                and ts_str.replace(b".", b"", 1).isdigit()
+            ):
+                return Annotation(float(ts_str), int(tid_str), label.decode("utf-8", "replace"))
+
+        # Slow path for lines the fast path cannot handle
+        match = self._ann_re.match(line)
 
         if not match:
             return None
 
         thread_id = int(match.group(1))
         timestamp = float(match.group(2))
-        label = match.group(3).strip()
+        label = match.group(3).strip().decode("utf-8", "replace")
 
         return Annotation(timestamp, thread_id, label)
 
     def analyze_timeline(self):
         """Analyze events and print timeline information."""
-        print("\n" + "=" * 60)
-        print("OMPT TIMELINE ANALYSIS")
-        print("=" * 60)
-
-        # Sort events by timestamp
-        sorted_events = sorted(self.events, key=lambda x: x.timestamp)
-        sorted_annotations = sorted(self.annotations, key=lambda x: x.timestamp)
-
-        # Combine events and annotations for chronological display
-        all_items = []
-        for event in sorted_events:
-            all_items.append(("event", event))
-        for annotation in sorted_annotations:
-            all_items.append(("annotation", annotation))
-
-        # Sort combined items by timestamp
-        all_items.sort(key=lambda x: x[1].timestamp)
+        # Collect the report and write it out in one go; per-line print()
+        # calls dominate runtime on large traces
+        out = []
+        out.append("\n" + "=" * 60)
+        out.append("OMPT TIMELINE ANALYSIS")
+        out.append("=" * 60)
+
+        # Sort events by timestamp, unless parsing found them already in order
+        if not self._events_sorted:
+            self._sort_events()
+            self._events_sorted = True
+        if not self._annotations_sorted:
+            self.annotations.sort(key=attrgetter("timestamp"))
+            self._annotations_sorted = True
+        timestamps = self.timestamps
+        event_types = self.event_types
+        sorted_annotations = self.annotations
+
+        # Both streams are sorted, so the reference times are their heads: the
+        # timeline listing is relative to the earliest item of either kind,
+        # the thread and region summaries to the first event
+        event_base_time = timestamps[0] if timestamps else 0
+        if sorted_annotations and (
+            not timestamps or sorted_annotations[0].timestamp < event_base_time
+        ):
+            base_time = sorted_annotations[0].timestamp
+        else:
+            base_time = event_base_time
+
+        # Merge the two sorted streams for chronological display. Rows are
+        # (timestamp, thread_id, text, details), with details None marking an
+        # annotation. On equal timestamps heapq.merge keeps events first.
+        all_items = heapq.merge(
+            zip(
+                timestamps,
+                self.thread_ids,
+                map(event_types.__getitem__, self.event_type_ids),
+                map(self.details.get, range(len(timestamps)), repeat("")),
+            ),
+            ((a.timestamp, a.thread_id, a.label, None) for a in sorted_annotations),
+            key=itemgetter(0),
+        )
 
-        print(
-            f"\nTimeline of Events and Annotations ({len(sorted_events)} events, {len(sorted_annotations)} annotations):"
+        out.append(
+            f"\nTimeline of Events and Annotations ({len(timestamps)} events, {len(sorted_annotations)} annotations):"
         )
-        print("-" * 80)
+        out.append("-" * 80)
 
         # Print items in chronological order
-        base_time = all_items[0][1].timestamp if all_items else 0
-        for i, (item_type, item) in enumerate(all_items):
-            relative_time = item.timestamp - base_time
-            if item_type == "event":
-                print(
-                    f"{i+1:3d}. {relative_time:8.2f}ms | Thread {item.thread_id} | {item.event_type}"
-                )
-                if item.details:
-                    print(f"     {' '*10} | Details: {item.details}")
+        for i, (timestamp, thread_id, text, details) in enumerate(all_items, 1):
+            relative_time = timestamp - base_time
+            if details is not None:
+                out.append(_EVENT_FMT % (i, relative_time, thread_id, text))
+                if details:
+                    out.append(_DETAILS_FMT % details)
             else:  # annotation
-                print(
-                    f"{i+1:3d}. {relative_time:8.2f}ms | Thread {item.thread_id} | ANNOTATION: {item.label}"
-                )
+                out.append(_ANN_FMT % (i, relative_time, thread_id, text))
 
         # Add annotations section to output
         if self.annotations:
-            print(f"\n" + "=" * 60)
-            print("ANNOTATIONS SUMMARY")
-            print("=" * 60)
+            out.append(f"\n" + "=" * 60)
+            out.append("ANNOTATIONS SUMMARY")
+            out.append("=" * 60)
 
             for annotation in sorted_annotations:
                 relative_time = annotation.timestamp - base_time
-                print(
+                out.append(
                     f"  {relative_time:8.2f}ms | Thread {annotation.thread_id} | {annotation.label}"
                 )
 
         # Analyze thread activities
-        print(f"\n" + "=" * 60)
-        print("THREAD ACTIVITY SUMMARY")
-        print("=" * 60)
-
-        thread_events = defaultdict(list)
-        base_time = sorted_events[0].timestamp if sorted_events else 0
-        for event in sorted_events:
-            thread_events[event.thread_id].append(event)
+        out.append(f"\n" + "=" * 60)
+        out.append("THREAD ACTIVITY SUMMARY")
+        out.append("=" * 60)
+
+        # Reduce each thread's events (rows grouped during parsing) with NumPy
+        timestamps = np.frombuffer(self.timestamps, dtype=np.float64)
+        type_ids = np.frombuffer(self.event_type_ids, dtype=np.intc)
+        no_rows = np.empty(0, dtype=np.int64)
+        base_time = event_base_time
+
+        def type_id_of(event_type):
+            return self._event_type_ids.get(event_type, -1)
+
+        task_start_id = type_id_of("TASK START")
+        work_start_id = type_id_of("WORK START")
+        work_end_id = type_id_of("WORK END")
+        task_finish_id = type_id_of("TASK FINISH")
+        barrier_enter_ids = [
+            k for k, t in enumerate(self.event_types) if "ENTER" in t and "barrier" in t
+        ]
+        barrier_exit_ids = [
+            k for k, t in enumerate(self.event_types) if "EXIT" in t and "barrier" in t
+        ]
 
         for thread_id in self.threads:
-            events = thread_events[thread_id]
-            print(f"\nThread {thread_id} ({len(events)} events):")
+            rows = self.thread_events.get(thread_id, no_rows)
+            thread_ts = timestamps[rows]
+            thread_types = type_ids[rows]
+            out.append(f"\nThread {thread_id} ({len(rows)} events):")
 
             # Find key timings
-            task_starts = [e for e in events if e.event_type == "TASK START"]
-            work_starts = [e for e in events if e.event_type == "WORK START"]
-            work_ends = [e for e in events if e.event_type == "WORK END"]
-            barrier_enters = [
-                e
-                for e in events
-                if "ENTER" in e.event_type and "barrier" in e.event_type
-            ]
-            barrier_exits = [
-                e
-                for e in events
-                if "EXIT" in e.event_type and "barrier" in e.event_type
-            ]
-            task_finishes = [e for e in events if e.event_type == "TASK FINISH"]
-
-            if task_starts:
-                print(
-                    f"  First task start: {task_starts[0].timestamp - base_time:.2f}ms"
+            task_starts = thread_ts[thread_types == task_start_id]
+            work_starts = thread_ts[thread_types == work_start_id]
+            work_ends = thread_ts[thread_types == work_end_id]
+            barrier_enters = thread_ts[np.isin(thread_types, barrier_enter_ids)]
+            barrier_exits = thread_ts[np.isin(thread_types, barrier_exit_ids)]
+            task_finishes = thread_ts[thread_types == task_finish_id]
+
+            if task_starts.size:
+                out.append(
+                    f"  First task start: {task_starts[0] - base_time:.2f}ms"
                 )
-            if work_starts and work_ends:
-                total_work_time = sum(
-                    work_ends[i].timestamp - work_starts[i].timestamp
-                    for i in range(min(len(work_starts), len(work_ends)))
-                )
-                print(f"  Total work time: {total_work_time:.2f}ms")
-            if barrier_enters and barrier_exits:
-                total_barrier_time = sum(
-                    barrier_exits[i].timestamp - barrier_enters[i].timestamp
-                    for i in range(min(len(barrier_enters), len(barrier_exits)))
-                )
-                print(f"  Total barrier time: {total_barrier_time:.2f}ms")
-            if task_finishes:
-                print(
-                    f"  Last task finish: {task_finishes[-1].timestamp - base_time:.2f}ms"
+            if work_starts.size and work_ends.size:
+                k = min(work_starts.size, work_ends.size)
+                total_work_time = (work_ends[:k] - work_starts[:k]).sum()
+                out.append(f"  Total work time: {total_work_time:.2f}ms")
+            if barrier_enters.size and barrier_exits.size:
+                k = min(barrier_enters.size, barrier_exits.size)
+                total_barrier_time = (barrier_exits[:k] - barrier_enters[:k]).sum()
+                out.append(f"  Total barrier time: {total_barrier_time:.2f}ms")
+            if task_finishes.size:
+                out.append(
+                    f"  Last task finish: {task_finishes[-1] - base_time:.2f}ms"
                 )
 
         # Parallel region analysis
-        print(f"\n" + "=" * 60)
-        print("PARALLEL REGION ANALYSIS")
-        print("=" * 60)
+        out.append(f"\n" + "=" * 60)
+        out.append("PARALLEL REGION ANALYSIS")
+        out.append("=" * 60)
 
-        parallel_begins = [e for e in sorted_events if e.event_type == "PARALLEL BEGIN"]
-        parallel_ends = [e for e in sorted_events if e.event_type == "PARALLEL END"]
+        parallel_begins = timestamps[type_ids == type_id_of("PARALLEL BEGIN")]
+        parallel_ends = timestamps[type_ids == type_id_of("PARALLEL END")]
 
-        print(f"Number of parallel regions: {len(parallel_begins)}")
+        out.append(f"Number of parallel regions: {len(parallel_begins)}")
 
         for i in range(min(len(parallel_begins), len(parallel_ends))):
-            begin_time = parallel_begins[i].timestamp - base_time
-            end_time = parallel_ends[i].timestamp - base_time
+            begin_time = parallel_begins[i] - base_time
+            end_time = parallel_ends[i] - base_time
             duration = end_time - begin_time
-            print(
+            out.append(
                 f"  Region {i+1}: {begin_time:.2f}ms -> {end_time:.2f}ms (duration: {duration:.2f}ms)"
             )
 
+        sys.stdout.write("\n".join(out))
+        sys.stdout.write("\n")
+
 
 def main():
     if len(sys.argv) != 2:
@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
+import os
 import sys
 import re
+import mmap
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib
 matplotlib.use('Agg')  # Use a non-GUI backend
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from collections import defaultdict
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba is optional; the state machine then runs as plain Python
+    numba = None
 
 # Color scheme for different states
 COLORS = {
@@ -15,282 +27,386 @@ COLORS = {
     'background': '#ECEFF1',     		# Light gray - background
 }
 
-class TimelineEvent:
-    def __init__(self, time, thread_id, event_type, details=""):
-        self.time = time
-        self.thread_id = thread_id
-        self.event_type = event_type
-        self.details = details
+# Timeline rows of the parser output, compiled once at import. The file is
+# parsed as raw bytes, so the pattern is a bytes pattern too.
+# e.g. "  1.     0.00ms | Thread 0 | TASK START"
+_EVENT_RE = re.compile(rb'\s*\d+\.\s*([\d.]+)ms\s*\|\s*Thread\s+(\d+)\s*\|\s*(.+)')
+_ANNOT_PREFIX = b'ANNOTATION:'
+
+# Event type codes, assigned once per event at parse time so the state
+# machine compares small integers instead of event type strings
+(PARALLEL_BEGIN, PARALLEL_END, TASK_START, WORK_START, WORK_END,
+ BARRIER_ENTER, BARRIER_EXIT, TASK_FINISH, OTHER_EVENT) = range(9)
+_EVENT_CODES = {
+    'PARALLEL BEGIN': PARALLEL_BEGIN,
+    'PARALLEL END': PARALLEL_END,
+    'TASK START': TASK_START,
+    'WORK START': WORK_START,
+    'WORK END': WORK_END,
+    'TASK FINISH': TASK_FINISH,
+}
+# The same codes keyed by the raw event type bytes read from the file
+_EVENT_TYPE_CODES = {
+    event_type.encode(): code for event_type, code in _EVENT_CODES.items()
+}
+
+# Thread state codes; thread state records are STATE_DTYPE arrays
+STATE_ACTIVE, STATE_IDLE_BARRIER, STATE_IDLE_SEQUENTIAL = range(3)
+STATE_NAMES = ('active', 'idle_barrier', 'idle_sequential')
+STATE_DTYPE = np.dtype([('start', 'f8'), ('end', 'f8'), ('state', 'u1')])
+
+def _jit(func):
+    """Compile func with Numba in nopython mode, if Numba is installed.
+
+    The compiled function releases the GIL, so it can run on several threads.
+    """
+    if numba is None:
+        return func
+    return numba.njit(cache=True, nogil=True)(func)
+
+def _event_code(event_type):
+    """Return the event type code of an event type string"""
+    code = _EVENT_CODES.get(event_type)
+    if code is None:
+        # Barrier events name their sync kind, e.g. "ENTER implicit_barrier"
+        if 'ENTER' in event_type and 'barrier' in event_type:
+            code = BARRIER_ENTER
+        elif 'EXIT' in event_type and 'barrier' in event_type:
+            code = BARRIER_EXIT
+        else:
+            code = OTHER_EVENT
+    return code
 
 class TimelineAnnotation:
+    __slots__ = ('time', 'thread_id', 'label')
+    
     def __init__(self, time, thread_id, label):
         self.time = time
         self.thread_id = thread_id
         self.label = label
 
+@_jit
+def _analyze_thread(times, codes, is_master, first_parallel_end, max_time,
+                    starts, ends, states):
+    """Run the state machine of one thread over its time-sorted event stream.
+
+    The stream holds the thread's own events and the master's PARALLEL ENDs.
+    first_parallel_end is the earliest master PARALLEL END time and max_time
+    the latest event time, where the final state ends. The state records are
+    written to the starts, ends and states output arrays; returns the number
+    of records written.
+    """
+    n = 0
+    
+    # Track current state of the thread. Master starts as active, others as idle_sequential
+    state = STATE_ACTIVE if is_master else STATE_IDLE_SEQUENTIAL
+    state_start = 0.0
+    
+    for time, code in zip(times, codes):
+        # Handle different event types
+        
+        if code == PARALLEL_END:
+            # When master thread ends parallel region, all threads should go to idle_barrier
+            # End current state
+            duration = time - state_start
+            if duration > 0.01:  # Only record if > 0.01ms
+                starts[n] = state_start
+                ends[n] = time
+                # The master thread is recorded as active
+                states[n] = STATE_ACTIVE if is_master else state
+                n += 1
+            
+            # Start idle_sequential state for all non-master threads
+            # Master thread remains active
+            state = STATE_ACTIVE if is_master else STATE_IDLE_SEQUENTIAL
+            state_start = time
+            
+        elif code == TASK_START or code == WORK_START:
+            # End current state and start task or active work
+            duration = time - state_start
+            if duration > 0.01:  # Only record if > 0.01ms
+                starts[n] = state_start
+                ends[n] = time
+                states[n] = state
+                n += 1
+            state = STATE_ACTIVE
+            state_start = time
+            
+        elif code == WORK_END:
+            # End active work
+            if state == STATE_ACTIVE:
+                starts[n] = state_start
+                ends[n] = time
+                states[n] = STATE_ACTIVE
+                n += 1
+            state = STATE_IDLE_BARRIER
+            state_start = time
+            
+        elif code == BARRIER_ENTER:
+            # End current state and start barrier wait (idle_barrier).
+            # Post-work waiting is barrier waiting, so the state carries over
+            duration = time - state_start
+            if duration > 0.1:  # Only record if > 0.1ms
+                starts[n] = state_start
+                ends[n] = time
+                states[n] = state
+                n += 1
+            state = STATE_IDLE_BARRIER
+            state_start = time
+            
+        elif code == BARRIER_EXIT or code == TASK_FINISH:
+            # For non-master threads, ignore barrier exits and task finishes
+            # that happen after a PARALLEL END, because they belong to the
+            # previous region. Some PARALLEL END precedes the event exactly
+            # when the earliest one does, so one comparison is enough
+            if not is_master and first_parallel_end < time:
+                continue
+            
+            if code == BARRIER_EXIT:
+                # End barrier wait for master thread or valid exits
+                if state == STATE_IDLE_BARRIER:
+                    starts[n] = state_start
+                    ends[n] = time
+                    states[n] = STATE_IDLE_BARRIER
+                    n += 1
+                state = STATE_ACTIVE
+            else:
+                # End current state
+                duration = time - state_start
+                if duration > 0.1:  # Only record if > 0.1ms
+                    starts[n] = state_start
+                    ends[n] = time
+                    states[n] = state
+                    n += 1
+                state = STATE_ACTIVE if is_master else STATE_IDLE_SEQUENTIAL
+            state_start = time
+    
+    # Handle final state; without any events max_time is 0 and nothing is recorded
+    if state_start < max_time:
+        duration = max_time - state_start
+        if duration > 0.1:  # Only record if > 0.1ms
+            starts[n] = state_start
+            ends[n] = max_time
+            states[n] = state
+            n += 1
+    
+    return n
+
 class TimelinePlotter:
     def __init__(self, parser_output_file):
         self.parser_output_file = parser_output_file
-        self.events = []
+        # Events are stored column-wise, one NumPy array per field, instead
+        # of one object per event
+        self.event_times = np.empty(0, dtype=np.float64)
+        self.event_thread_ids = np.empty(0, dtype=np.int32)
+        self.event_codes = np.empty(0, dtype=np.int8)
+        self._t_min = self._t_max = 0.0
+        self._events_sorted = True
+        self._order = None  # stable time order of the events, if not sorted
         self.annotations = []
-        self.threads = set()
+        self.threads = []
         self.parallel_regions = []
-        self.thread_states = defaultdict(list)
+        # STATE_DTYPE records of all threads, grouped by thread in the order
+        # of self.threads; thread_states maps each thread id to its slice
+        self.state_records = np.empty(0, dtype=STATE_DTYPE)
+        self.thread_states = {}
         self.parallel_end_events = []  # Track PARALLEL END events
         
     def parse_output_file(self):
         """Parse the text output from ompt_parser.py"""
         print(f"Reading parser output: {self.parser_output_file}")
         
-        with open(self.parser_output_file, 'r') as f:
-            content = f.read()
-        
-        # Extract events from the timeline section
-        timeline_section = re.search(r'Timeline of Events.*?(?=^=)', content, re.MULTILINE | re.DOTALL)
-        if not timeline_section:
+        # Map the file and read the timeline section line by line as bytes;
+        # nothing is copied or decoded beyond the rows themselves
+        timeline_rows = None
+        with open(self.parser_output_file, 'rb') as f:
+            # mmap cannot map an empty file
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    header = buf.find(b'Timeline of Events')
+                    if header != -1:
+                        # Rows start on the line after the header
+                        buf.seek(header)
+                        buf.readline()
+                        timeline_rows = self._parse_timeline_rows(iter(buf.readline, b''))
+        
+        if timeline_rows is None:
             raise ValueError("Could not find timeline section in parser output")
         
-        timeline_text = timeline_section.group(0)
-        
-        # Parse individual events and annotations
-        # Pattern for events: "  1.     0.00ms | Thread 0 | TASK START"
-        # Pattern for annotations: "  1.     0.00ms | Thread 0 | ANNOTATION: label"
-        event_pattern = r'\s*\d+\.\s*([\d.]+)ms\s*\|\s*Thread\s+(\d+)\s*\|\s*(.+?)(?:\n|$)'
+        event_times, event_thread_ids, event_codes = timeline_rows
+        # Sort annotations by time once here; the plot and the statistics
+        # use them in this order. They are nearly always in order already.
+        self.annotations.sort(key=attrgetter('time'))
+        self.event_times = np.array(event_times, dtype=np.float64)
+        self.event_thread_ids = np.array(event_thread_ids, dtype=np.int32)
+        self.event_codes = np.array(event_codes, dtype=np.int8)
+        # Time range and time order of the events, computed once for both
+        # the analysis and the plot. The parser output lists events in time
+        # order, so the sort is only needed if that check fails.
+        times = self.event_times
+        self._events_sorted = not np.any(times[1:] < times[:-1])
+        if self._events_sorted:
+            self._order = None
+            if len(times):
+                self._t_min, self._t_max = times[0], times[-1]
+        else:
+            self._order = np.argsort(times, kind='stable')
+            self._t_min, self._t_max = times.min(), times.max()
+        # Thread ids of events and annotations, sorted and deduplicated in one pass
+        annotation_thread_ids = [annotation.thread_id for annotation in self.annotations]
+        self.threads = np.unique(
+            np.concatenate((self.event_thread_ids, np.array(annotation_thread_ids, dtype=np.int32)))
+        ).tolist()
+        print(f"Parsed {len(self.event_times)} events and {len(self.annotations)} annotations for {len(self.threads)} threads")
+        print(f"Found {len(self.parallel_end_events)} parallel region endings")
         
-        for match in re.finditer(event_pattern, timeline_text):
-            time = float(match.group(1))
-            thread_id = int(match.group(2))
-            event_content = match.group(3).strip()
+    def _parse_timeline_rows(self, lines):
+        """Parse timeline rows up to the end of the section.
+
+        lines yields the raw bytes lines after the timeline header. Annotations
+        and master PARALLEL END times are stored on the plotter; returns the
+        (times, thread ids, codes) lists of the events.
+        """
+        type_codes = dict(_EVENT_TYPE_CODES)  # raw event type -> code, incl. barrier types seen
+        event_times, event_thread_ids, event_codes = [], [], []
+        for line in lines:
+            # The timeline section ends at the next "====" header
+            if line.startswith(b'='):
+                break
             
-            # Check if this is an annotation
-            if event_content.startswith('ANNOTATION:'):
-                annotation_label = event_content.replace('ANNOTATION:', '').strip()
-                self.annotations.append(TimelineAnnotation(time, thread_id, annotation_label))
-            else:
-                # Regular event
-                self.events.append(TimelineEvent(time, thread_id, event_content))
+            # Parse individual events and annotations
+            # Pattern for events: "  1.     0.00ms | Thread 0 | TASK START"
+            # Pattern for annotations: "  1.     0.00ms | Thread 0 | ANNOTATION: label"
+            parts = line.split(b'|', 2)
+            if len(parts) != 3:
+                continue  # e.g. "| Details: ..." continuation lines
+            
+            head, thread_field, event_content = parts
+            try:
+                # Fast path: fixed "  1.     0.00ms " and " Thread 0 " fields
+                time = float(head.split()[-1][:-2])
+                thread_id = int(thread_field[8:])
+                event_content = event_content.strip()
+            except (ValueError, IndexError):
+                # Slow path for rows the fast path cannot handle
+                match = _EVENT_RE.match(line)
+                if not match:
+                    continue
+                time = float(match.group(1))
+                thread_id = int(match.group(2))
+                event_content = match.group(3).strip()
+            
+            # Known event types resolve with a single lookup, so only content
+            # not seen before is checked for the annotation prefix
+            code = type_codes.get(event_content)
+            if code is None:
+                # Check if this is an annotation
+                if event_content.startswith(_ANNOT_PREFIX):
+                    annotation_label = event_content.replace(_ANNOT_PREFIX, b'').strip()
+                    # Labels such as ROI markers repeat; share one str per label
+                    annotation_label = sys.intern(annotation_label.decode('utf-8', 'replace'))
+                    self.annotations.append(TimelineAnnotation(time, thread_id, annotation_label))
+                    continue
                 
-                # Track PARALLEL END events (only from master thread)
-                if event_content == 'PARALLEL END' and thread_id == 0:
-                    self.parallel_end_events.append(time)
+                # Regular event of a new type; its code is worked out once
+                code = type_codes[event_content] = _event_code(
+                    event_content.decode('utf-8', 'replace')
+                )
+            
+            event_times.append(time)
+            event_thread_ids.append(thread_id)
+            event_codes.append(code)
             
-            self.threads.add(thread_id)
+            # Track PARALLEL END events (only from master thread)
+            if code == PARALLEL_END and thread_id == 0:
+                self.parallel_end_events.append(time)
         
-        self.threads = sorted(list(self.threads))
-        print(f"Parsed {len(self.events)} events and {len(self.annotations)} annotations for {len(self.threads)} threads")
-        print(f"Found {len(self.parallel_end_events)} parallel region endings")
+        return event_times, event_thread_ids, event_codes
         
     def analyze_thread_states(self):
         """Convert events into thread state timelines with enhanced idle state logic"""
         print("Analyzing thread states ...")
         
-        # Initialize thread states
-        for thread_id in self.threads:
-            self.thread_states[thread_id] = []
-        
-        # Track current state of each thread
-        thread_status = {}
+        # Sort events by time, unless parsing found them already in order;
+        # the state machine then only compares floats and small integer codes
+        if self._events_sorted:
+            times, thread_ids, codes = self.event_times, self.event_thread_ids, self.event_codes
+        else:
+            order = self._order
+            times = self.event_times[order]
+            thread_ids = self.event_thread_ids[order]
+            codes = self.event_codes[order]
+        
+        # PARALLEL BEGIN and END are only called from master thread
         master_thread = 0
+        is_master = thread_ids == master_thread
+        is_parallel_end = codes == PARALLEL_END
+        self.parallel_regions = times[is_master & (codes == PARALLEL_BEGIN)].tolist()
+        
+        # A thread's states only depend on its own events and on the master's
+        # PARALLEL ENDs, which end the current state of every thread. Split
+        # the sorted events into one stream per thread holding both; a
+        # non-master PARALLEL END changes nothing and is dropped.
+        parallel_end_rows = np.flatnonzero(is_master & is_parallel_end)
+        own_rows = np.flatnonzero(~is_parallel_end)
+        own_rows = own_rows[np.argsort(thread_ids[own_rows], kind='stable')]
+        own_thread_ids = thread_ids[own_rows]
+        threads = np.asarray(self.threads, dtype=np.int32)
+        lows = np.searchsorted(own_thread_ids, threads, side='left').tolist()
+        highs = np.searchsorted(own_thread_ids, threads, side='right').tolist()
+        streams = []
+        for low, high in zip(lows, highs):
+            rows = np.concatenate((own_rows[low:high], parallel_end_rows))
+            rows.sort()  # Back to time order
+            streams.append(rows)
+        
+        # Each thread writes into its own part of one record buffer: its
+        # events end at most one state each, plus the final state
+        records = np.empty(sum(len(rows) + 1 for rows in streams), dtype=STATE_DTYPE)
+        first_parallel_end = min(self.parallel_end_events, default=np.inf)
+        outs = []
+        offset = 0
+        for rows in streams:
+            outs.append(records[offset:offset + len(rows) + 1])
+            offset += len(rows) + 1
+        
+        def analyze_thread(thread_id, rows, out):
+            thread_times, thread_codes = times[rows], codes[rows]
+            if numba is None:
+                # Plain Python iterates lists of floats and ints much faster
+                # than it boxes NumPy scalars one element at a time
+                thread_times, thread_codes = thread_times.tolist(), thread_codes.tolist()
+            return _analyze_thread(
+                thread_times, thread_codes, thread_id == master_thread,
+                first_parallel_end, self._t_max,
+                out['start'], out['end'], out['state'],
+            )
         
-        # Sort events by time
-        sorted_events = sorted(self.events, key=lambda x: x.time)
-
-				# Initialize thread status. Master starts as active, others as idle_sequential
-        for thread_id in self.threads:
-            if thread_id == master_thread:
-                thread_status[thread_id] = {'state': 'active', 'start_time': 0}
-            else:
-                thread_status[thread_id] = {'state': 'idle_sequential', 'start_time': 0}
-        
-        for event in sorted_events:
-            thread_id = event.thread_id
-            
-            # Initialize thread status if not exists. It is unlikely to happen :)
-            if thread_id not in thread_status:
-                if thread_id == master_thread:
-                    thread_status[thread_id] = {'state': 'active', 'start_time': 0}
-            
-            # Handle different event types
-            
-            # PARALLEL BEGIN and END are only called from master thread
-            if event.event_type == 'PARALLEL BEGIN':
-                if thread_id == master_thread:
-                    self.parallel_regions.append(event.time)
-                
-            elif event.event_type == 'PARALLEL END':
-                if thread_id == master_thread:
-                    # When master thread ends parallel region, all threads should go to idle_barrier
-                    for tid in self.threads:
-                        if tid in thread_status:
-                            # End current state
-                            current_state = thread_status[tid]['state']
-                            duration = event.time - thread_status[tid]['start_time']
-                            if duration > 0.01:  # Only record if > 0.01ms
-                                if tid != master_thread:			# Non-master threads
-                                    self.thread_states[tid].append({
-                                        'start': thread_status[tid]['start_time'],
-                                        'end': event.time,
-                                        'state': current_state
-                                    })
-                                else:													# Master thread		
-                                    self.thread_states[tid].append({
-                                        'start': thread_status[tid]['start_time'],
-                                        'end': event.time,
-                                        'state': 'active'
-                                    })
-                            
-                            # Start idle_sequential state for all non-master threads
-                            if tid != master_thread:
-                                thread_status[tid] = {'state': 'idle_sequential', 'start_time': event.time}
-                            # Master thread remains active
-                            else:
-                                thread_status[tid] = {'state': 'active', 'start_time': event.time}
-                
-            elif event.event_type == 'TASK START':
-                # End current state and start task
-                current_state = thread_status[thread_id]['state']
-                duration = event.time - thread_status[thread_id]['start_time']
-                if duration > 0.01:  # Only record if > 0.01ms
-                    # If we were in idle_barrier, switch to idle_sequential just before task start
-                    # if current_state == 'idle_barrier':
-                    #     # Add a very short idle_sequential period
-                    #     self.thread_states[thread_id].append({
-                    #         'start': thread_status[thread_id]['start_time'],
-                    #         # 'end': event.time - 0.01,  # End just before task start
-                    #         'end': event.time,  # End at task start
-                    #         'state': 'idle_barrier'
-                    #     })
-                    # else:
-                    #     self.thread_states[thread_id].append({
-                    #         'start': thread_status[thread_id]['start_time'],
-                    #         'end': event.time,
-                    #         'state': current_state
-                    #     })
-                    self.thread_states[thread_id].append({
-                            'start': thread_status[thread_id]['start_time'],
-                            'end': event.time,
-                            'state': current_state
-                        })    
-                thread_status[thread_id] = {'state': 'active', 'start_time': event.time}
-                
-            elif event.event_type == 'WORK START':
-                # End task_ready state and start active work
-                current_state = thread_status[thread_id]['state']
-                duration = event.time - thread_status[thread_id]['start_time']
-                if duration > 0.01:  # Only record if > 0.01ms
-                    # Task setup time is considered idle_sequential
-                    # state_type = 'idle_sequential' if current_state == 'task_ready' else current_state
-                    self.thread_states[thread_id].append({
-                        'start': thread_status[thread_id]['start_time'],
-                        'end': event.time,
-                        'state': current_state
-                    })
-                thread_status[thread_id] = {'state': 'active', 'start_time': event.time}
-                
-            elif event.event_type == 'WORK END':
-                # End active work
-                current_state = thread_status[thread_id]['state']
-                if thread_status[thread_id]['state'] == 'active':
-                    self.thread_states[thread_id].append({
-                        'start': thread_status[thread_id]['start_time'],
-                        'end': event.time,
-                        'state': current_state
-                    })
-                thread_status[thread_id] = {'state': 'idle_barrier', 'start_time': event.time}
-                
-            elif 'ENTER' in event.event_type and 'barrier' in event.event_type:
-                # End current state and start barrier wait (idle_barrier)
-                current_state = thread_status[thread_id]['state']
-                duration = event.time - thread_status[thread_id]['start_time']
-                if duration > 0.1:  # Only record if > 0.1ms
-                    if current_state == 'active':
-                        state_type = 'active'
-                    elif current_state == 'idle_barrier':
-                        state_type = 'idle_barrier'  # Post-work waiting is barrier waiting
-                    else:
-                        state_type = current_state
-                        
-                    self.thread_states[thread_id].append({
-                        'start': thread_status[thread_id]['start_time'],
-                        'end': event.time,
-                        'state': state_type
-                    })
-                thread_status[thread_id] = {'state': 'idle_barrier', 'start_time': event.time}
-                
-            elif 'EXIT' in event.event_type and 'barrier' in event.event_type:
-                # For non-master threads, ignore barrier exit if it happens after PARALLEL END
-                # because they're exiting a barrier from the previous region
-                if thread_id != master_thread:
-                    # Check if this exit happens after any PARALLEL END
-                    is_cross_region_exit = any(pe_time < event.time for pe_time in self.parallel_end_events)
-                    if is_cross_region_exit:
-                        # This is a cross-region barrier exit, don't record it as ending idle_barrier
-                        continue
-                
-                # End barrier wait for master thread or valid exits
-                if thread_status[thread_id]['state'] == 'idle_barrier':
-                    self.thread_states[thread_id].append({
-                        'start': thread_status[thread_id]['start_time'],
-                        'end': event.time,
-                        'state': 'idle_barrier'
-                    })
-                
-                thread_status[thread_id] = {'state': 'active', 'start_time': event.time}
-            elif event.event_type == 'TASK FINISH':
-                # For non-master threads, ignore task finish if it happens after PARALLEL END
-                # because they're finishing a task from the previous region
-                if thread_id != master_thread:
-                    # Check if this finish happens after any PARALLEL END
-                    is_cross_region_finish = any(pe_time < event.time for pe_time in self.parallel_end_events)
-                    if is_cross_region_finish:
-                        # This is a cross-region task finish, don't process it
-                        continue
-                
-                # End current state
-                current_state = thread_status[thread_id]['state']
-                duration = event.time - thread_status[thread_id]['start_time']
-                if duration > 0.1:  # Only record if > 0.1ms
-                    # if current_state == 'active':
-                    #     state_type = 'idle_barrier'
-                    # elif current_state == 'post_work':
-                    #     state_type = 'idle_barrier'
-                    # else:
-                    #     state_type = current_state
-                        
-                    self.thread_states[thread_id].append({
-                        'start': thread_status[thread_id]['start_time'],
-                        'end': event.time,
-                        'state': current_state
-                    })
-                if thread_id != master_thread:
-                    thread_status[thread_id] = {'state': 'idle_sequential', 'start_time': event.time}
-                else:
-                    thread_status[thread_id] = {'state': 'active', 'start_time': event.time}
-        
-        # Handle final states
-        if sorted_events:
-            max_time = max(event.time for event in sorted_events)
-            for thread_id, status in thread_status.items():
-                if status['start_time'] < max_time:
-                    duration = max_time - status['start_time']
-                    if duration > 0.1:  # Only record if > 0.1ms
-                        final_state = 'idle_sequential'
-                        if status['state'] in ['idle_barrier', 'post_barrier']:
-                            final_state = 'idle_barrier'
-                        elif status['state'] in ['active']:
-                            final_state = 'active'
-                            
-                        self.thread_states[thread_id].append({
-                            'start': status['start_time'],
-                            'end': max_time,
-                            'state': final_state
-                        })
+        # The streams share nothing, so they can run concurrently. The Numba
+        # build releases the GIL, so threads scale across cores; the plain
+        # Python fallback would only contend for the GIL and runs serially.
+        if numba is not None and len(streams) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(streams), os.cpu_count() or 1)) as pool:
+                counts = list(pool.map(analyze_thread, self.threads, streams, outs))
+        else:
+            counts = list(map(analyze_thread, self.threads, streams, outs))
+        thread_records = [out[:n] for out, n in zip(outs, counts)]
+        
+        # Pack the records grouped by thread; the per-thread state arrays are
+        # views of the packed buffer
+        if thread_records:
+            self.state_records = np.concatenate(thread_records)
+        bounds = np.cumsum([len(out) for out in thread_records], dtype=np.int64).tolist()
+        self.thread_states = {
+            thread_id: self.state_records[low:high]
+            for thread_id, low, high in zip(self.threads, [0] + bounds, bounds)
+        }
     
-    def create_timeline_plot(self, output_file='thread_timeline.png'):
+    def create_timeline_plot(self, output_file='thread_timeline.pdf'):
         """Create and save the timeline visualization"""
         print(f"Creating timeline visualization: {output_file}")
         
-        if not self.events:
+        if not len(self.event_times):
             print("No events to plot")
             return
             
@@ -302,8 +418,8 @@ class TimelinePlotter:
         fig, ax = plt.subplots(figsize=(fig_width, fig_height))
         
         # Calculate time range
-        min_time = min(event.time for event in self.events)
-        max_time = max(event.time for event in self.events)
+        min_time = self._t_min
+        max_time = self._t_max
         time_range = max_time - min_time
         
         # Set up the plot
@@ -312,30 +428,41 @@ class TimelinePlotter:
         
         # Draw thread timelines
         bar_height = 0.7
-        for i, thread_id in enumerate(self.threads):
-            y_pos = num_threads - 1 - i
-            
-            # Draw background
-            ax.barh(y_pos, max_time - min_time, height=bar_height, 
-                   left=min_time, color=COLORS['background'], alpha=0.3)
-            
-            # Draw thread states
-            for state_info in self.thread_states[thread_id]:
-                duration = state_info['end'] - state_info['start']
-                if duration > 0:
-                    color = COLORS.get(state_info['state'], COLORS['background'])
-                    ax.barh(y_pos, duration, height=bar_height,
-                           left=state_info['start'], color=color, alpha=0.9)
-                          #  linewidth=0.1)
-                        #    edgecolor='white', linewidth=0.5)
+        
+        # Draw background as the axes face rather than one bar per thread
+        ax.set_facecolor(to_rgba(COLORS['background'], alpha=0.3))
+        
+        # Draw thread states as one PolyCollection per state instead of one
+        # barh patch per state record
+        states = self.state_records
+        y_pos = np.repeat(np.arange(num_threads - 1, -1, -1),
+                          [len(self.thread_states[thread_id]) for thread_id in self.threads])
+        visible = states['end'] > states['start']
+        for state, state_name in enumerate(STATE_NAMES):
+            mask = visible & (states['state'] == state)
+            x_low, x_high = states['start'][mask], states['end'][mask]
+            y_low = y_pos[mask] - bar_height / 2
+            y_high = y_low + bar_height
+            # One rectangle (4 vertices) per state record
+            verts = np.stack([
+                np.stack([x_low, x_low, x_high, x_high], axis=1),
+                np.stack([y_low, y_high, y_high, y_low], axis=1),
+            ], axis=2)
+            ax.add_collection(PolyCollection(verts, facecolors=COLORS[state_name],
+                                             edgecolors='none', alpha=0.9))
         
         # Add annotation markers as vertical dashed lines
         if self.annotations:
             print(f"Adding {len(self.annotations)} annotation markers")
+            # All markers as one LineCollection spanning the thread rows,
+            # rather than one axvline artist each
+            ax.add_collection(LineCollection(
+                [[(annotation.time, -0.5), (annotation.time, num_threads - 0.5)]
+                 for annotation in self.annotations],
+                colors='#2c3e50', linestyles='--', alpha=0.8, linewidths=0.5,
+            ))
+            
             for annotation in self.annotations:
-                ax.axvline(x=annotation.time, color='#2c3e50', 
-                          linestyle='--', alpha=0.8, linewidth=0.5)
-                
                 # Add annotation label at the top
                 ax.text(annotation.time, num_threads - 0.1, annotation.label, 
                        rotation=90, ha='right', va='bottom', fontsize=8,
@@ -381,7 +508,13 @@ class TimelinePlotter:
             ax.set_xticklabels([f'{tick/1000:.1f}' for tick in current_ticks])
         
         plt.tight_layout()
-        plt.savefig(output_file.replace('.png', '.pdf'), format='pdf', dpi=300, bbox_inches='tight')
+        # Save only the format the output file name asks for (PDF if it has no
+        # extension); rendering a second format doubles the save time
+        ext = os.path.splitext(output_file)[1].lower()
+        if not ext:
+            ext = '.pdf'
+            output_file += ext
+        plt.savefig(output_file, format=ext[1:], dpi=150 if ext == '.png' else 300, bbox_inches='tight')
         print(f"Timeline saved as: {output_file}")
 
         # Print statistics
@@ -393,48 +526,46 @@ class TimelinePlotter:
         print("TIMELINE STATISTICS")
         print("="*60)
         
-        total_times = defaultdict(float)
+        total_times = np.zeros(len(STATE_NAMES))
         
         for thread_id in self.threads:
-            thread_total = defaultdict(float)
+            # Time spent in each state, summed per state code in one pass
+            states = self.thread_states[thread_id]
+            thread_total = np.bincount(states['state'], weights=states['end'] - states['start'],
+                                       minlength=len(STATE_NAMES))
+            total_times += thread_total
             
-            for state_info in self.thread_states[thread_id]:
-                duration = state_info['end'] - state_info['start']
-                state = state_info['state']
-                thread_total[state] += duration
-                total_times[state] += duration
-            
-            total_time = sum(thread_total.values())
+            total_time = thread_total.sum()
             if total_time > 0:
                 print(f"\nThread {thread_id}:")
-                print(f"  Active:          {thread_total['active']:8.2f} ms ({thread_total['active']/total_time*100:5.1f}%)")
-                print(f"  Idle-Barrier:    {thread_total['idle_barrier']:8.2f} ms ({thread_total['idle_barrier']/total_time*100:5.1f}%)")
-                print(f"  Idle-Sequential: {thread_total['idle_sequential']:8.2f} ms ({thread_total['idle_sequential']/total_time*100:5.1f}%)")
+                print(f"  Active:          {thread_total[STATE_ACTIVE]:8.2f} ms ({thread_total[STATE_ACTIVE]/total_time*100:5.1f}%)")
+                print(f"  Idle-Barrier:    {thread_total[STATE_IDLE_BARRIER]:8.2f} ms ({thread_total[STATE_IDLE_BARRIER]/total_time*100:5.1f}%)")
+                print(f"  Idle-Sequential: {thread_total[STATE_IDLE_SEQUENTIAL]:8.2f} ms ({thread_total[STATE_IDLE_SEQUENTIAL]/total_time*100:5.1f}%)")
                 print(f"  Total:           {total_time:8.2f} ms")
         
         # Overall statistics
-        overall_total = sum(total_times.values())
+        overall_total = total_times.sum()
         if overall_total > 0:
             print(f"\nOverall (all threads combined):")
-            print(f"  Active:          {total_times['active']:8.2f} ms ({total_times['active']/overall_total*100:5.1f}%)")
-            print(f"  Idle-Barrier:    {total_times['idle_barrier']:8.2f} ms ({total_times['idle_barrier']/overall_total*100:5.1f}%)")
-            print(f"  Idle-Sequential: {total_times['idle_sequential']:8.2f} ms ({total_times['idle_sequential']/overall_total*100:5.1f}%)")
-            print(f"  Total:           {total_times['idle_sequential'] + total_times['idle_barrier'] + total_times['active']:8.2f} ms")
+            print(f"  Active:          {total_times[STATE_ACTIVE]:8.2f} ms ({total_times[STATE_ACTIVE]/overall_total*100:5.1f}%)")
+            print(f"  Idle-Barrier:    {total_times[STATE_IDLE_BARRIER]:8.2f} ms ({total_times[STATE_IDLE_BARRIER]/overall_total*100:5.1f}%)")
+            print(f"  Idle-Sequential: {total_times[STATE_IDLE_SEQUENTIAL]:8.2f} ms ({total_times[STATE_IDLE_SEQUENTIAL]/overall_total*100:5.1f}%)")
+            print(f"  Total:           {total_times[STATE_IDLE_SEQUENTIAL] + total_times[STATE_IDLE_BARRIER] + total_times[STATE_ACTIVE]:8.2f} ms")
         
         # Print annotation information if any exist
         if self.annotations:
             print(f"\nAnnotations found ({len(self.annotations)} total):")
-            for annotation in sorted(self.annotations, key=lambda x: x.time):
+            for annotation in self.annotations:
                 print(f"  {annotation.time:8.2f}ms | Thread {annotation.thread_id} | {annotation.label}")
 
 def main():
     if len(sys.argv) < 2 or len(sys.argv) > 3:
-        print("Usage: python3 timeline_plotter.py <parser_output_file>")
-        print("Example: python3 timeline_plotter.py parser_output.txt")
+        print("Usage: python3 timeline_plotter.py <parser_output_file> [output_file]")
+        print("Example: python3 timeline_plotter.py parser_output.txt timeline.pdf")
         sys.exit(1)
     
     parser_output_file = sys.argv[1]
-    output_plot_file = sys.argv[2] if len(sys.argv) > 2 else 'thread_timeline.png'
+    output_plot_file = sys.argv[2] if len(sys.argv) > 2 else 'thread_timeline.pdf'
     try:
         plotter = TimelinePlotter(parser_output_file)
         plotter.parse_output_file()